@@ -80,7 +80,8 @@ setup(
     ],
     extras_require={
         "tf": ['tensorflow'],
-        "tf_gpu": ['tensorflow-gpu']
+        "tf_gpu": ['tensorflow-gpu'],
+        "zarr": ['zarr<3']
     },
     entry_points={
         'console_scripts': [
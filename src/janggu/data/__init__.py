@@ -59,6 +59,18 @@ def view(dataset, use_regions):
 
     check_gindexer_compatibility(gind, dataset.garray.resolution,
                                  dataset.garray._full_genome_stored)
+
+    if dataset.garray._full_genome_stored:
+        # chromosomes that were not loaded into the genomic array
+        # would silently be returned as padding.
+        missing = sorted(set(gind.chrs) - set(dataset.garray.handle))
+        if missing:
+            raise ValueError('The regions use chromosomes that are not '
+                             'contained in the dataset: {}. Consider '
+                             'creating the dataset with a roi covering '
+                             'these chromosomes or with roi=None.'.format(
+                                 ', '.join(missing)))
+
     subdata = copy(dataset)
     subdata.gindexer = gind
 
@@ -1,10 +1,14 @@
 """Coverage dataset"""
 
+import array
 import copy
+import itertools
 import os
 import tempfile
 import warnings
 from collections import OrderedDict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pyBigWig
@@ -19,6 +23,7 @@ from janggu.data.genomic_indexer import GenomicIndexer
 from janggu.data.genomic_indexer import check_gindexer_compatibility
 from janggu.data.genomicarray import create_genomic_array
 from janggu.data.genomicarray import create_sha256_cache
+from janggu.data.genomicarray import get_collapser
 from janggu.utils import _check_valid_files
 from janggu.utils import _get_genomic_reader
 from janggu.utils import _to_list
@@ -27,12 +32,122 @@ from janggu.utils import isbedgraph
 from janggu.version import dataversion as version
 
 
+# maximum distance in base pairs between intervals
+# that are fetched jointly from a bigwig file.
+_BIGWIG_MAXGAP = 10000
+
+# bigwig files that cover less than this fraction of the genome
+# are read interval-wise.
+_BIGWIG_SPARSE_COVERAGE = 0.5
+
+
+# SAM flags used for filtering reads
+_BAM_FPAIRED = 0x1
+_BAM_FPROPER_PAIR = 0x2
+_BAM_FUNMAP = 0x4
+_BAM_FREVERSE = 0x10
+_BAM_FREAD2 = 0x80
+
+# number of reads that are processed at once
+_BAM_BATCHSIZE = 65536
+
+
+def _bounded_map(executor, func, arglist, maxpending):
+    """Maps a function over a list of arguments using an executor.
+
+    At most maxpending tasks are submitted at a time, which bounds
+    the memory consumed by results that have not been consumed yet.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        Executor that runs the tasks.
+    func : callable
+        Function to be applied.
+    arglist : list(tuple)
+        List of argument tuples for func.
+    maxpending : int
+        Maximum number of pending tasks.
+
+    Yields
+    ------
+    object
+        The function results in the order of arglist.
+    """
+    pending = deque()
+    for args in arglist:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= maxpending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _map_tasks(func, arglist, workers):
+    """Maps a function over a list of arguments.
+
+    With a single worker, the function is applied in the current process.
+    Otherwise, the tasks are distributed across a pool of worker processes
+    which is opened for the duration of the iteration.
+
+    Parameters
+    ----------
+    func : callable
+        Function to be applied. Must be defined at module level
+        if workers > 1.
+    arglist : list(tuple)
+        List of argument tuples for func.
+    workers : int
+        Number of worker processes.
+
+    Yields
+    ------
+    object
+        The function results in the order of arglist.
+    """
+    if workers <= 1 or len(arglist) <= 1:
+        for args in arglist:
+            yield func(*args)
+        return
+
+    nworkers = min(workers, len(arglist))
+    with ProcessPoolExecutor(max_workers=nworkers) as executor:
+        for result in _bounded_map(executor, func, arglist, 2*nworkers):
+            yield result
+
+
 def _condition_from_filename(files, conditions):
     if conditions is None:
         conditions = [os.path.splitext(os.path.basename(f))[0]
                       for f in files]
     return conditions
 
+
+def _restrict_genomesize(gsize, gindexer):
+    """Restricts the genome size to the chromosomes of the regions of interest.
+
+    Parameters
+    ----------
+    gsize : dict
+        Dictionary with keys and values representing chromosome names
+        and lengths, respectively.
+    gindexer : GenomicIndexer or None
+        Regions of interest. If None, gsize is returned unchanged.
+
+    Returns
+    -------
+    dict
+        Genome size containing only the chromosomes that
+        are covered by the regions of interest.
+    """
+    if gindexer is None:
+        return gsize
+
+    chroms = set(gindexer.chrs)
+    return OrderedDict((chrom, gsize[chrom]) for chrom in gsize
+                       if chrom in chroms)
+
+
 class BedGenomicSizeLazyLoader:
     """BedGenomicSizeLazyLoader class
 
@@ -78,7 +193,8 @@ class BedGenomicSizeLazyLoader:
                 if gsize[region.chrom] < region.end:
                     gsize[region.chrom] = region.end
 
-        gsize_ = GenomicIndexer.create_from_genomesize(gsize)
+        gsize_ = GenomicIndexer.create_from_genomesize(
+            _restrict_genomesize(gsize, self.external_gindexer))
 
         self.gsize_ = gsize_
 
@@ -133,108 +249,239 @@ class BamLoader:
         Minimum mapping quality to be considered.
     pairedend : str
         Paired-end mode 'midpoint' or '5prime'.
+    workers : int
+        Number of worker processes used for counting the reads.
+        If 1, the reads are counted in the current process. Default: 1.
     verbose : boolean
         Default: False
     """
     def __init__(self, files, gsize, template_extension,
-                 min_mapq, pairedend, verbose=False):
+                 min_mapq, pairedend, workers=1, verbose=False):
         self.files = files
         self.gsize = gsize
         self.template_extension = template_extension
         self.min_mapq = min_mapq
         self.pairedend = pairedend
+        self.workers = workers
         self.verbose = verbose
 
     def __call__(self, garray):
         files = self.files
         gsize = self.gsize
-        template_extension = self.template_extension
-        resolution = garray.resolution
         dtype = garray.typecode
         min_mapq = self.min_mapq
         pairedend = self.pairedend
+        stranded = garray.stranded
+
+        unique_chroms = list(set(gsize.chrs))
+        chrom_gsize = {chrom: gsize.filter_by_region(include=chrom)
+                       for chrom in unique_chroms}
+
+        # each (file, chromosome) pair is counted independently,
+        # optionally in separate worker processes. The results are
+        # written to the garray in the main process.
+        tasks = [(i, sample_file, chrom) for i, sample_file in enumerate(files)
+                 for chrom in unique_chroms]
+
+        if self.verbose: bar = Bar('Loading bam files', max=len(tasks))
+        # workers that are not occupied by a task are used for
+        # decompressing the bam files.
+        threads = max(1, self.workers // max(len(tasks), 1))
+        results = _map_tasks(_count_bam_chrom,
+                             [(sample_file, chrom, min_mapq, pairedend,
+                               dtype, stranded, threads)
+                              for _, sample_file, chrom in tasks],
+                             self.workers)
+
+        for (i, _, chrom), counts in zip(tasks, results):
+            # the strands are kept as separate contiguous arrays
+            # and only the interval slices are combined
+            for interval in chrom_gsize[chrom]:
+                block = np.empty((interval.end - interval.start, len(counts)),
+                                 dtype=dtype)
+                for strand, count in enumerate(counts):
+                    block[:, strand] = count[interval.start:interval.end]
+                garray[interval, i] = block
+            if self.verbose: bar.next()
+        if self.verbose: bar.finish()
+        return garray
+
+
+def _count_bam_chrom(sample_file, chrom, min_mapq, pairedend, dtype,
+                     stranded=True, threads=1):
+    """Counts the reads of a bam file along a given chromosome.
+
+    The file is opened within this function, such that it can
+    be run in a separate process.
+
+    Parameters
+    ----------
+    sample_file : str
+        Bam file location.
+    chrom : str
+        Chromosome name.
+    min_mapq : int
+        Minimum mapping quality to be considered.
+    pairedend : str
+        Paired-end mode 'midpoint' or '5prime'.
+    dtype : str
+        Datatype in which the reads are counted.
+    stranded : boolean
+        If False, the read counts of both strands are summed up.
+        Default: True.
+    threads : int
+        Number of threads used by pysam for decompressing the bam file.
+        Default: 1.
+
+    Returns
+    -------
+    tuple(np.ndarray)
+        Read counts on the forward and reverse strand or
+        the strand-unspecific read counts if stranded=False.
+    """
+    aln_file = pysam.AlignmentFile(sample_file, 'rb',  # pylint: disable=no-member
+                                   threads=threads)
+
+    length = aln_file.header.get_reference_length(chrom)
+    tid = aln_file.get_tid(chrom)
+
+    # the reads are processed in batches in order to bound
+    # the memory consumption for large bam files.
+    counts = [np.zeros((length,), dtype=dtype)
+              for _ in range(2 if stranded else 1)]
+    reads = aln_file.fetch(str(chrom))
+    while True:
+        batch = list(itertools.islice(reads, _BAM_BATCHSIZE))
+        if not batch:
+            break
+
+        positions, reverse = _bam_read_positions(batch, tid, min_mapq,
+                                                 pairedend, length)
+        if stranded:
+            # fill up the read strand specifically
+            _add_read_counts(counts[0], positions[~reverse])
+            _add_read_counts(counts[1], positions[reverse])
+        else:
+            _add_read_counts(counts[0], positions)
 
-        if self.verbose: bar = Bar('Loading bam files'.format(len(files)), max=len(files))
-        for i, sample_file in enumerate(files):
-            aln_file = pysam.AlignmentFile(sample_file, 'rb')  # pylint: disable=no-member
+    aln_file.close()
 
-            unique_chroms = list(set(gsize.chrs))
-            for process_chrom in unique_chroms:
-                tmp_gsize = gsize.filter_by_region(include=process_chrom)
-                length = aln_file.header.get_reference_length(process_chrom)
+    return tuple(counts)
 
-                array = np.zeros((length, 2), dtype=dtype)
 
-                for aln in aln_file.fetch(str(process_chrom)):
+def _add_read_counts(count, positions):
+    """Adds the read positions of a batch to the chromosome counts.
 
-                    if aln.is_unmapped:
-                        continue
+    Since the reads are fetched in sorted order, a batch only
+    spans a small window of the chromosome. The positions are therefore
+    tallied relative to the window start rather than across
+    the entire chromosome.
 
-                    if aln.mapq < min_mapq:
-                        continue
+    Parameters
+    ----------
+    count : np.ndarray
+        Read counts along the chromosome.
+    positions : np.ndarray
+        Read positions of the batch.
+    """
+    if len(positions) == 0:
+        return
+    offset = positions.min()
+    tally = np.bincount(positions - offset)
+    window = count[offset:offset + len(tally)]
+    np.add(window, tally, out=window, casting='unsafe')
 
-                    if aln.is_paired:
-                        # if paired end read, consider the midpoint
-                        if not (aln.is_proper_pair and
-                                aln.reference_name == aln.next_reference_name):
-                            # only consider paired end reads if both mates
-                            # are properly mapped and they map to the
-                            # same reference_name
-                            continue
-                        # if the next reference start >= 0,
-                        # the read is considered as a paired end read
-                        # in this case we consider the mid point
-                        if pairedend == 'midpoint':
-                            if aln.is_read2:
-                                # only consider read1 so as not to double count
-                                # fragments for paired end reads
-                                # read2 will also be false for single end
-                                # reads.
-                                continue
-                            pos = min(aln.reference_start,
-                                      aln.next_reference_start) + \
-                                      abs(aln.template_length) // 2
-                        else:
-
-                            if aln.is_reverse:
-                                # last position of the downstream read
-                                pos = max(aln.reference_end,
-                                          aln.next_reference_start +
-                                          aln.query_length)
-                            else:
-                                # first position of the upstream read
-                                pos = min(aln.reference_start,
-                                          aln.next_reference_start)
-                    else:
-                        # here we consider single end reads
-                        # whose 5 prime end is determined strand specifically
-                        if aln.is_reverse:
-                            pos = aln.reference_end
-                        else:
-                            pos = aln.reference_start
-
-                    if not garray._full_genome_stored:
-                        # if we get here, a region was given,
-                        # otherwise, the entire chromosome is read.
-                        #pos -= start + template_extension
-
-                        if pos < 0 or pos >= length:
-                            # if the read 5 p end or mid point is outside
-                            # of the region of interest, the read is discarded
-                            continue
-
-                    # fill up the read strand specifically
-                    if aln.is_reverse:
-                        array[pos, 1] += 1
-                    else:
-                        array[pos, 0] += 1
 
-                for interval in tmp_gsize:
-                    garray[interval, i] = array[interval.start:interval.end, :]
-            if self.verbose: bar.next()
-        if self.verbose: bar.finish()
-        return garray
+def _bam_read_positions(reads, tid, min_mapq, pairedend, length):
+    """Determines the 5 prime end or mid point positions of a batch of reads.
 
+    Parameters
+    ----------
+    reads : list(pysam.AlignedSegment)
+        Reads from a single chromosome.
+    tid : int
+        Reference id of the chromosome.
+    min_mapq : int
+        Minimum mapping quality to be considered.
+    pairedend : str
+        Paired-end mode 'midpoint' or '5prime'.
+    length : int
+        Chromosome length.
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray)
+        Positions and reverse strand indicators of the reads
+        that passed the filters.
+    """
+    # the read attributes are collected as columns first.
+    # The read filtering and the 5 prime end or mid point positions
+    # are then determined with vectorized numpy operations.
+    flags = array.array('l')
+    starts = array.array('l')
+    ends = array.array('l')
+    next_tids = array.array('l')
+    next_starts = array.array('l')
+    template_lengths = array.array('l')
+    query_lengths = array.array('l')
+    mapqs = array.array('l')
+
+    for aln in reads:
+        flags.append(aln.flag)
+        starts.append(aln.reference_start)
+        # reference_end is None for unmapped reads,
+        # which are discarded below.
+        ends.append(aln.reference_end or 0)
+        next_tids.append(aln.next_reference_id)
+        next_starts.append(aln.next_reference_start)
+        template_lengths.append(aln.template_length)
+        query_lengths.append(aln.query_length)
+        mapqs.append(aln.mapping_quality)
+
+    flags = np.asarray(flags)
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+    next_starts = np.asarray(next_starts)
+
+    paired = (flags & _BAM_FPAIRED) > 0
+    reverse = (flags & _BAM_FREVERSE) > 0
+
+    keep = ((flags & _BAM_FUNMAP) == 0) & (np.asarray(mapqs) >= min_mapq)
+
+    # only consider paired end reads if both mates
+    # are properly mapped and they map to the
+    # same reference_name
+    keep &= ~paired | (((flags & _BAM_FPROPER_PAIR) > 0) &
+                       (np.asarray(next_tids) == tid))
+
+    # here we consider single end reads
+    # whose 5 prime end is determined strand specifically
+    positions = np.where(reverse, ends, starts)
+
+    if pairedend == 'midpoint':
+        # only consider read1 so as not to double count
+        # fragments for paired end reads
+        keep &= ~(paired & ((flags & _BAM_FREAD2) > 0))
+        positions = np.where(paired,
+                             np.minimum(starts, next_starts) +
+                             np.abs(np.asarray(template_lengths)) // 2,
+                             positions)
+    else:
+        # last position of the downstream read or
+        # first position of the upstream read
+        positions = np.where(paired & reverse,
+                             np.maximum(ends, next_starts +
+                                        np.asarray(query_lengths)),
+                             positions)
+        positions = np.where(paired & ~reverse,
+                             np.minimum(starts, next_starts),
+                             positions)
+
+    # if the read 5 p end or mid point is outside
+    # of the chromosome, the read is discarded
+    keep &= (positions >= 0) & (positions < length)
+
+    return positions[keep], reverse[keep]
 
 
 class BigWigLoader:
@@ -251,46 +498,314 @@ class BigWigLoader:
         GenomicIndexer representing the genomic region that should be loaded.
     nan_to_num : bool
         Whether to convert NAN's to zeros or not. Default: True.
+    collapser : None, str or callable
+        Collapse method used by the genomic array. If 'mean', 'sum' or 'max',
+        the signal is summarized per resolution-sized bin
+        for all intervals of a span at once. Default: None.
+    scale : dict or None
+        Per chromosome scaling factors for each file. If given, the signal
+        is divided by the scaling factors and rounded before it is stored.
+        Default: None.
+    workers : int
+        Number of worker processes used for reading the files.
+        If 1, the files are read in the current process. Default: 1.
     verbose : boolean
         Default: False
     """
-    def __init__(self, files, gsize, nan_to_num, verbose=False):
+    def __init__(self, files, gsize, nan_to_num, collapser=None, scale=None,
+                 workers=1, verbose=False):
         self.files = files
         self.gsize = gsize
         self.nan_to_num = nan_to_num
+        self.collapser = collapser
+        self.scale = scale
+        self.workers = workers
         self.verbose = verbose
 
     def __call__(self, garray):
         files = self.files
         gsize = self.gsize
         resolution = garray.resolution
-        dtype = garray.typecode
+        # the signal is quantized after fetching it from the files
+        dtype = garray.typecode if self.scale is None else 'float32'
         nan_to_num = self.nan_to_num
 
-        if self.verbose: bar = Bar('Loading bigwig files'.format(len(files)), max=len(files))
-        for i, sample_file in enumerate(files):
-            bwfile = pyBigWig.open(sample_file)
+        # named collapse methods can be applied per span in a single
+        # reduction rather than for each interval separately.
+        binned = self.collapser in ['mean', 'sum', 'max'] and \
+            resolution is not None and resolution > 1
+
+        # neighboring intervals are fetched from the bigwig files
+        # jointly in order to reduce the number of queries.
+        unique_chroms = list(set(gsize.chrs))
+        chrom_spans = {}
+        for chrom in unique_chroms:
+            chrom_spans[chrom] = [
+                (span_start, span_end, intervals,
+                 binned and all(iv.start % resolution == 0 and
+                                iv.end % resolution == 0 for iv in intervals))
+                for span_start, span_end, intervals in
+                _merge_intervals(gsize.filter_by_region(include=chrom),
+                                 _BIGWIG_MAXGAP)]
+
+        # each (file, chromosome) pair is fetched independently,
+        # optionally in separate worker processes. The results are
+        # written to the garray in the main process.
+        tasks = [(i, sample_file, chrom) for i, sample_file in enumerate(files)
+                 for chrom in unique_chroms]
+
+        if self.verbose: bar = Bar('Loading bigwig files', max=len(tasks))
+        results = _map_tasks(_load_bigwig_chrom,
+                             [(sample_file, chrom,
+                               [(span_start, span_end, use_bins)
+                                for span_start, span_end, _, use_bins
+                                in chrom_spans[chrom]],
+                               nan_to_num, resolution,
+                               self.collapser if binned else None, dtype)
+                              for _, sample_file, chrom in tasks],
+                             self.workers)
+
+        for (i, _, chrom), span_values in zip(tasks, results):
+
+            for (span_start, _, intervals, use_bins), values in \
+                    zip(chrom_spans[chrom], span_values):
+                if self.scale is not None:
+                    values = _quantize(values, self.scale[chrom][i])
+                binsize = resolution if use_bins else 1
+                for interval in intervals:
+                    garray[interval, i] = values[
+                        int(interval.start - span_start)//binsize:
+                        int(interval.end - span_start)//binsize, :]
+            if self.verbose: bar.next()
+        if self.verbose: bar.finish()
+        return garray
 
-            unique_chroms = list(set(gsize.chrs))
-            for process_chrom in unique_chroms:
-                tmp_gsize = gsize.filter_by_region(include=process_chrom)
-                length = max(tmp_gsize.ends) + tmp_gsize.flank
 
-                array = np.zeros((length, 1), dtype=dtype)
+def _quantize(values, scale):
+    """Converts values to the int16 range given a scaling factor."""
+    int16 = np.iinfo('int16')
+    return np.clip(np.round(values / scale), int16.min, int16.max)
 
-                values = np.asarray(bwfile.values(str(process_chrom),
-                                                  int(0),
-                                                  int(length)))
-                if nan_to_num:
-                    values = np.nan_to_num(values, copy=False)
 
-                array[:len(values), 0] = values
+def _bigwig_quantization_scale(files, chroms):
+    """Determines the per chromosome scaling factors of bigwig files.
+
+    The scaling factors map the largest absolute value of a file
+    on a chromosome to the maximum of the int16 range.
+
+    Parameters
+    ----------
+    files : list(str)
+        Bigwig file locations.
+    chroms : list(str)
+        Chromosome names.
+
+    Returns
+    -------
+    dict
+        Dictionary with chromosome names as keys and arrays
+        of scaling factors, one per file, as values.
+    """
+    scale = {chrom: np.ones((len(files),), dtype='float32') for chrom in chroms}
+    for i, sample_file in enumerate(files):
+        bwfile = pyBigWig.open(sample_file)
+        for chrom in chroms:
+            if not bwfile.chroms(str(chrom)):
+                continue
+            # the minimum and maximum are obtained from the zoom levels
+            extremes = [val for val in bwfile.stats(str(chrom), type='min') +
+                        bwfile.stats(str(chrom), type='max') if val is not None]
+            maxabs = max([abs(val) for val in extremes] + [0.])
+            if maxabs > 0:
+                scale[chrom][i] = maxabs / np.iinfo('int16').max
+        bwfile.close()
+    return scale
+
+
+def _load_bigwig_chrom(sample_file, chrom, spans, nan_to_num, resolution,
+                       collapser, dtype):
+    """Fetches the signal of a bigwig file for a set of spans on a chromosome.
+
+    The file is opened within this function, such that it can
+    be run in a separate process.
+
+    Parameters
+    ----------
+    sample_file : str
+        Bigwig file location.
+    chrom : str
+        Chromosome name.
+    spans : list(tuple)
+        List of (start, end, binned) tuples. If binned is True,
+        the signal per resolution-sized bin is summarized using
+        the collapser for the span. Otherwise, the signal is
+        returned at base-pair resolution.
+    nan_to_num : bool
+        Whether to convert NAN's to zeros or not.
+    resolution : int or None
+        Bin size used for the binned spans.
+    collapser : str or None
+        Collapse method 'mean', 'sum' or 'max' used for the binned spans.
+    dtype : str
+        Datatype of the returned arrays.
+
+    Returns
+    -------
+    list(np.ndarray)
+        List of 2D arrays, one per span.
+    """
+    bwfile = pyBigWig.open(sample_file)
+    chrom_length = bwfile.chroms(str(chrom)) or 0
+
+    # for sparsely covered bigwig files, the signal is assembled
+    # from the stored intervals rather than queried per base pair.
+    sparse = bwfile.header()['nBasesCovered'] < \
+        _BIGWIG_SPARSE_COVERAGE * sum(bwfile.chroms().values())
+
+    results = []
+    for span_start, span_end, binned in spans:
+
+        if binned and collapser == 'mean' and nan_to_num:
+            # bin means can be obtained from the bigwig files directly,
+            # which avoids fetching the signal at base-pair resolution.
+            means = _bigwig_bin_means(bwfile, str(chrom),
+                                      span_start, span_end,
+                                      chrom_length, resolution)
+            results.append(means[:, None].astype(dtype))
+            continue
+
+        array = np.zeros((span_end - span_start, 1), dtype=dtype)
+
+        # regions beyond the chromosome end remain zero
+        fetch_end = min(span_end, chrom_length)
+        if fetch_end > span_start:
+            values = _bigwig_values(bwfile, str(chrom), span_start,
+                                    fetch_end, sparse)
+            if nan_to_num:
+                values = np.nan_to_num(values, copy=False)
+
+            array[:len(values), 0] = values
+
+        if binned:
+            # the span boundaries are multiples of the resolution
+            array = get_collapser(collapser)(
+                array.reshape((-1, resolution, 1)))
+        results.append(array)
+
+    bwfile.close()
+    return results
+
+
+def _bigwig_values(bwfile, chrom, start, end, sparse):
+    """Fetches the signal of a bigwig file at base-pair resolution.
+
+    Parameters
+    ----------
+    bwfile : pyBigWig file
+        Opened bigwig file.
+    chrom : str
+        Chromosome name.
+    start : int
+        Start of the region.
+    end : int
+        End of the region. Must not exceed the chromosome length.
+    sparse : bool
+        If True, the signal is filled in from the intervals stored
+        in the bigwig file. Otherwise, the values are queried
+        for each base pair.
+
+    Returns
+    -------
+    np.ndarray
+        Signal of the region. Positions without signal are NaN.
+    """
+    if not sparse:
+        if pyBigWig.numpy:
+            return bwfile.values(chrom, int(start), int(end), numpy=True)
+        return np.asarray(bwfile.values(chrom, int(start), int(end)))
+
+    values = np.full((end - start,), np.nan)
+    for ivstart, ivend, value in bwfile.intervals(chrom, int(start),
+                                                  int(end)) or []:
+        values[max(ivstart, start) - start:min(ivend, end) - start] = value
+    return values
 
-                for interval in tmp_gsize:
-                    garray[interval, i] = array[int(interval.start):int(interval.end), :]
-            if self.verbose: bar.next()
-        if self.verbose: bar.finish()
-        return garray
+
+def _bigwig_bin_means(bwfile, chrom, start, end, chrom_length, resolution):
+    """Determines the mean signal in resolution-sized bins.
+
+    The bin sums are computed by pyBigWig. Missing values and positions
+    beyond the chromosome end count as zeros, which is equivalent to
+    averaging the signal after nan_to_num conversion.
+
+    Parameters
+    ----------
+    bwfile : pyBigWig file
+        Opened bigwig file.
+    chrom : str
+        Chromosome name.
+    start : int
+        Start of the region. Must be divisible by resolution.
+    end : int
+        End of the region. Must be divisible by resolution.
+    chrom_length : int
+        Chromosome length.
+    resolution : int
+        Bin size in base pairs.
+
+    Returns
+    -------
+    np.ndarray
+        Mean signal per bin.
+    """
+    sums = np.zeros(((end - start)//resolution,))
+
+    fetch_end = min(end, chrom_length)
+    nbins = max(0, (fetch_end - start)//resolution)
+    if nbins > 0:
+        sums[:nbins] = np.asarray(bwfile.stats(chrom, int(start),
+                                               int(start + nbins*resolution),
+                                               type='sum', nBins=nbins,
+                                               exact=True), dtype='float')
+    if start + nbins*resolution < fetch_end:
+        # partial bin at the chromosome end
+        sums[nbins] = np.asarray(bwfile.stats(chrom,
+                                              int(start + nbins*resolution),
+                                              int(fetch_end),
+                                              type='sum', nBins=1,
+                                              exact=True), dtype='float')[0]
+
+    # bins without signal are reported as None
+    return np.nan_to_num(sums, copy=False) / resolution
+
+
+def _merge_intervals(gindexer, maxgap):
+    """Merges the intervals of a GenomicIndexer into spans.
+
+    Intervals that overlap or that are at most maxgap base pairs apart
+    are assigned to the same span.
+
+    Parameters
+    ----------
+    gindexer : GenomicIndexer
+        GenomicIndexer containing intervals from a single chromosome.
+    maxgap : int
+        Maximum distance between intervals that are merged.
+
+    Returns
+    -------
+    list
+        List of (start, end, intervals) tuples, where intervals
+        contains the original intervals that fall into the span.
+    """
+    spans = []
+    for interval in sorted(gindexer, key=lambda iv: iv.start):
+        if spans and interval.start <= spans[-1][1] + maxgap:
+            spans[-1][1] = max(spans[-1][1], interval.end)
+            spans[-1][2].append(interval)
+        else:
+            spans.append([interval.start, interval.end, [interval]])
+    return [tuple(span) for span in spans]
 
 
 class BedLoader:
@@ -310,14 +825,19 @@ class BedLoader:
     minoverlap : float or None
         Minimum fraction of overlap of a given feature with a roi bin.
         Default: None (already a single base-pair overlap is considered)
+    workers : int
+        Number of worker processes used for parsing the files.
+        If 1, the files are parsed in the current process. Default: 1.
     verbose : boolean
         Default: False
     """
-    def __init__(self, files, lazyloader, mode, minoverlap, verbose=False):
+    def __init__(self, files, lazyloader, mode, minoverlap, workers=1,
+                 verbose=False):
         self.files = files
         self.lazyloader = lazyloader
         self.mode = mode
         self.minoverlap = minoverlap
+        self.workers = workers
         self.verbose = verbose
 
     def __call__(self, garray):
@@ -343,30 +863,31 @@ class BedLoader:
 
         gs = pd.DataFrame({'chrom': gsize.chrs, 'end': gsize.ends}).groupby('chrom').aggregate({'end':'max'})
 
-        for i, sample_file in enumerate(files):
-            regions_ = _get_genomic_reader(sample_file)
-
-            if regions_[0].score == '.' and mode in ['score',
-                                                     'categorical']:
+        for sample_file in files:
+            if _get_genomic_reader(sample_file)[0].score == '.' and \
+               mode in ['score', 'categorical']:
                 raise ValueError(
                     'No Score available. Score field must '
                     'present in {}'.format(sample_file) + \
                     'for mode="{}"'.format(mode))
 
+        # with several workers, the bed files are parsed in background
+        # processes, such that the next files are read while
+        # the current one is mapped to the rois.
+        bed_features = _map_tasks(_read_bed_features,
+                                  [(sample_file, list(gs.index), mode)
+                                   for sample_file in files],
+                                  self.workers)
+
+        for i, (sample_file, features) in enumerate(zip(files, bed_features)):
+            regions_ = _get_genomic_reader(sample_file)
+
             # init whole genome array
             arrays = {i: np.zeros((row['end'], 2), dtype=dtype) for i, row in gs.iterrows()}
 
             # load data from signal coverage
-            for region in regions_:
-                if not isbedgraph(sample_file):
-                    score = int(region.score) if mode == 'score' else 1
-                else:
-                    score = float(region.fields[-1])
-
-                if region.chrom in arrays:
-                    # first dim, score value, second dim, mask
-                    arrays[region.chrom][region.start:region.end, 0] = score
-                    arrays[region.chrom][region.start:region.end, 1] = 1
+            for chrom in arrays:
+                _fill_bed_array(arrays[chrom], *features[chrom])
 
             # map data to rois
             roiregs = roifile.intersect(regions_, wa=True, u=True)
@@ -403,6 +924,103 @@ class BedLoader:
         return garray
 
 
+def _read_bed_features(sample_file, chroms, mode):
+    """Reads the features of a bed file.
+
+    Parameters
+    ----------
+    sample_file : str
+        Bed file location.
+    chroms : list(str)
+        Chromosomes for which features are collected.
+    mode : str
+        Mode might be 'binary', 'score' or 'categorical'.
+
+    Returns
+    -------
+    dict
+        Dictionary of (starts, ends, scores) arrays per chromosome.
+    """
+    regions_ = _get_genomic_reader(sample_file)
+
+    # the score source is the same for all records of a file
+    bedgraph = isbedgraph(sample_file)
+    use_score = mode == 'score'
+
+    # collect the features per chromosome
+    features = {chrom: ([], [], []) for chrom in chroms}
+    for region in regions_:
+        if bedgraph:
+            score = float(region.fields[-1])
+        elif use_score:
+            score = int(region.score)
+        else:
+            score = 1
+
+        if region.chrom in features:
+            features[region.chrom][0].append(region.start)
+            features[region.chrom][1].append(region.end)
+            features[region.chrom][2].append(score)
+
+    return {chrom: (np.asarray(starts, dtype='int64'),
+                    np.asarray(ends, dtype='int64'),
+                    np.asarray(scores, dtype='float64'))
+            for chrom, (starts, ends, scores) in features.items()}
+
+
+def _fill_bed_array(array, starts, ends, scores):
+    """Fills a chromosome array with the features of a bed file.
+
+    The first column of the array receives the feature score and
+    the second column marks the positions that are covered by a feature.
+    If features overlap, the score of the later feature is retained.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        Array of shape (chromosome length, 2).
+    starts : np.ndarray
+        Feature starts.
+    ends : np.ndarray
+        Feature ends.
+    scores : np.ndarray
+        Feature scores.
+    """
+    if len(starts) == 0:
+        return
+
+    length = array.shape[0]
+    starts = np.minimum(np.asarray(starts), length)
+    ends = np.minimum(np.asarray(ends), length)
+    scores = np.asarray(scores)
+
+    # positions covered by at least one feature
+    # are determined from the cumulative sum of feature starts and ends.
+    # A single difference array is used and reused in place.
+    diff = np.zeros((length + 1,), dtype='int32')
+    np.add.at(diff, starts, 1)
+    np.add.at(diff, ends, -1)
+    np.cumsum(diff, out=diff)
+    depth = diff[:length]
+    covered = depth > 0
+
+    if np.all(scores == scores[0]):
+        array[covered, 0] = scores[0]
+    elif depth.max() <= 1:
+        # without overlaps, each covered position belongs to
+        # exactly one feature whose index is obtained in the same way.
+        index = np.arange(1, len(starts) + 1, dtype='int32')
+        diff[:] = 0
+        np.add.at(diff, starts, index)
+        np.add.at(diff, ends, -index)
+        np.cumsum(diff, out=diff)
+        array[covered, 0] = scores[diff[:length][covered] - 1]
+    else:
+        for start, end, score in zip(starts, ends, scores):
+            array[start:end, 0] = score
+    array[covered, 1] = 1
+
+
 class ArrayLoader:
     """ArrayLoader class.
 
@@ -493,6 +1111,7 @@ class Cover(Dataset):
                         zero_padding=True,
                         random_state=None,
                         store_whole_genome=False,
+                        workers=1,
                         verbose=False):
         """Create a Cover class from a bam-file (or files).
 
@@ -556,7 +1175,7 @@ class Cover(Dataset):
             Default: 1.
         storage : str
             Storage mode for storing the coverage data can be
-            'ndarray', 'hdf5' or 'sparse'. Default: 'ndarray'.
+            'ndarray', 'hdf5', 'zarr' or 'sparse'. Default: 'ndarray'.
         dtype : str
             Typecode to be used for storage the data.
             Default: 'int'.
@@ -611,7 +1230,15 @@ class Cover(Dataset):
         store_whole_genome : boolean
             Indicates whether the whole genome or only ROI
             should be loaded. If False, a bed-file with regions of interest
-            must be specified. Default: False
+            must be specified. If True and roi is given, only the
+            chromosomes that contain regions of interest are loaded. Default: False
+        workers : int
+            Number of worker processes used for reading the bam files.
+            If workers > 1, the files and chromosomes are processed
+            in parallel, which requires the calling script to be
+            protected by :code:`if __name__ == '__main__'` on platforms
+            that spawn new processes (e.g. Windows and macOS).
+            Default: 1.
         verbose : boolean
             Verbosity. Default: False
         """
@@ -661,10 +1288,11 @@ class Cover(Dataset):
                 gsize = {}
                 for chrom, length in zip(header.references, header.lengths):
                     gsize[chrom] = length
-            gsize = GenomicIndexer.create_from_genomesize(gsize)
+            gsize = GenomicIndexer.create_from_genomesize(
+                _restrict_genomesize(gsize, gindexer))
 
         bamloader = BamLoader(bamfiles, gsize, template_extension,
-                              min_mapq, pairedend, verbose)
+                              min_mapq, pairedend, workers, verbose)
 
         datatags = [name]
         normalizer = _to_list(normalizer)
@@ -680,7 +1308,7 @@ class Cover(Dataset):
                 files += [roi]
                 parameters += [binsize, stepsize, flank,
                                template_extension, random_state]
-            if storage == 'hdf5':
+            if storage in ['hdf5', 'zarr']:
                 parameters += normalizer
             cache_hash = create_sha256_cache(files, parameters)
         else:
@@ -720,6 +1348,8 @@ class Cover(Dataset):
                            collapser=None,
                            random_state=None,
                            nan_to_num=True,
+                           quantize=False,
+                           workers=1,
                            verbose=False):
         """Create a Cover class from a bigwig-file (or files).
 
@@ -776,7 +1406,7 @@ class Cover(Dataset):
             Default: 0.
         storage : str
             Storage mode for storing the coverage data can be
-            'ndarray', 'hdf5' or 'sparse'. Default: 'ndarray'.
+            'ndarray', 'hdf5', 'zarr' or 'sparse'. Default: 'ndarray'.
         dtype : str
             Typecode to define the datatype to be used for storage.
             Default: 'float32'.
@@ -792,7 +1422,8 @@ class Cover(Dataset):
         store_whole_genome : boolean
             Indicates whether the whole genome or only ROI
             should be loaded. If False, a bed-file with regions of interest
-            must be specified. Default: False.
+            must be specified. If True and roi is given, only the
+            chromosomes that contain regions of interest are loaded. Default: False.
         zero_padding : boolean
             Indicates if variable size intervals should be zero padded.
             Zero padding is only supported with a specified
@@ -818,6 +1449,24 @@ class Cover(Dataset):
         nan_to_num : boolean
             Indicates whether NaN values contained in the bigwig files should
             be interpreted as zeros. Default: True
+        quantize : boolean
+            If True, the signal is stored as int16 using per chromosome
+            scaling factors for each bigwig file which are derived from
+            the largest absolute signal value. The values are rescaled
+            when the data is retrieved. This halves the memory requirements
+            compared to float32 at the cost of precision.
+            The dtype option does not have an effect in this case.
+            Quantization requires nan_to_num=True, it is not compatible with
+            normalizer and only supports the collapsers 'mean' and 'max'
+            if resolution is not 1.
+            Default: False.
+        workers : int
+            Number of worker processes used for reading the bigwig files.
+            If workers > 1, the files and chromosomes are processed
+            in parallel, which requires the calling script to be
+            protected by :code:`if __name__ == '__main__'` on platforms
+            that spawn new processes (e.g. Windows and macOS).
+            Default: 1.
         random_state : None or int
             random_state used to internally randomize the dataset.
             This option is best used when consuming data for training
@@ -871,27 +1520,41 @@ class Cover(Dataset):
             else:
                 bwfile = pyBigWig.open(bigwigfiles[0], 'r')
                 gsize = bwfile.chroms()
-            gsize = GenomicIndexer.create_from_genomesize(gsize)
+            gsize = GenomicIndexer.create_from_genomesize(
+                _restrict_genomesize(gsize, gindexer))
 
         conditions = _condition_from_filename(bigwigfiles, conditions)
 
-        bigwigloader = BigWigLoader(bigwigfiles, gsize, nan_to_num, verbose)
-        datatags = [name]
-
         collapser_ = collapser if collapser is not None else 'mean'
         normalizer = _to_list(normalizer)
 
+        scale = None
+        if quantize:
+            if normalizer:
+                raise ValueError('quantize=True cannot be used with a normalizer.')
+            if not nan_to_num:
+                raise ValueError('quantize=True requires nan_to_num=True.')
+            if resolution != 1 and collapser_ not in ['mean', 'max']:
+                raise ValueError("quantize=True requires collapser 'mean' or 'max' "
+                                 "if resolution is not 1.")
+            scale = _bigwig_quantization_scale(bigwigfiles, list(set(gsize.chrs)))
+            dtype = 'int16'
+
+        bigwigloader = BigWigLoader(bigwigfiles, gsize, nan_to_num,
+                                    collapser_, scale, workers, verbose)
+        datatags = [name]
+
         if cache:
             files = copy.copy(bigwigfiles)
             parameters = [gsize.tostr(),
                           resolution, storage, dtype,
                           zero_padding,
                           collapser.__name__ if hasattr(collapser, '__name__') else collapser,
-                          store_whole_genome, nan_to_num, version]
+                          store_whole_genome, nan_to_num, quantize, version]
             if not store_whole_genome:
                 files += [roi]
                 parameters += [binsize, stepsize, flank, random_state]
-            if storage == 'hdf5':
+            if storage in ['hdf5', 'zarr']:
                 parameters += normalizer
             cache_hash = create_sha256_cache(files, parameters)
         else:
@@ -910,6 +1573,8 @@ class Cover(Dataset):
                                      normalizer=normalizer,
                                      verbose=verbose)
 
+        cover.scale = scale
+
         return cls(name, cover, gindexer)
 
     @classmethod
@@ -931,6 +1596,7 @@ class Cover(Dataset):
                         minoverlap=None,
                         random_state=None,
                         datatags=None, cache=False,
+                        workers=1,
                         verbose=False):
         """Create a Cover class from a bed-file (or files).
 
@@ -983,7 +1649,7 @@ class Cover(Dataset):
             Default: 0.
         storage : str
             Storage mode for storing the coverage data can be
-            'ndarray', 'hdf5' or 'sparse'. Default: 'ndarray'.
+            'ndarray', 'hdf5', 'zarr' or 'sparse'. Default: 'ndarray'.
         dtype : str
             Typecode to define the datatype to be used for storage.
             Default: 'int'.
@@ -1000,7 +1666,8 @@ class Cover(Dataset):
         store_whole_genome : boolean
             Indicates whether the whole genome or only ROI
             should be loaded. If False, a bed-file with regions of interest
-            must be specified. Default: False.
+            must be specified. If True and roi is given, only the
+            chromosomes that contain regions of interest are loaded. Default: False.
         zero_padding : boolean
             Indicates if variable size intervals should be zero padded.
             Zero padding is only supported with a specified
@@ -1041,6 +1708,13 @@ class Cover(Dataset):
             (e.g. input and output datasets) use the same random_state
             value so that the datasets are synchronized.
             Default: None means that no randomization is used.
+        workers : int
+            Number of worker processes used for parsing the bed files.
+            If workers > 1, the files are parsed in background processes,
+            which requires the calling script to be
+            protected by :code:`if __name__ == '__main__'` on platforms
+            that spawn new processes (e.g. Windows and macOS).
+            Default: 1.
         verbose : boolean
             Verbosity. Default: False
         """
@@ -1093,7 +1767,8 @@ class Cover(Dataset):
                 conditions = [str(i) for i in range(int(max_class + 1))]
         conditions = _condition_from_filename(bedfiles, conditions)
 
-        bedloader = BedLoader(bedfiles, gsize, mode, minoverlap, verbose)
+        bedloader = BedLoader(bedfiles, gsize, mode, minoverlap, workers,
+                              verbose)
 
         datatags = [name]
 
@@ -1113,7 +1788,7 @@ class Cover(Dataset):
             if not store_whole_genome:
                 files += [roi]
                 parameters += [random_state]
-            if storage == 'hdf5':
+            if storage in ['hdf5', 'zarr']:
                 parameters += normalizer
             cache_hash = create_sha256_cache(files, parameters)
         else:
@@ -1174,7 +1849,7 @@ class Cover(Dataset):
             and file-ending).
         storage : str
             Storage mode for storing the coverage data can be
-            'ndarray', 'hdf5' or 'sparse'. Default: 'ndarray'.
+            'ndarray', 'hdf5', 'zarr' or 'sparse'. Default: 'ndarray'.
         overwrite : boolean
             Overwrite cachefiles. Default: False.
         datatags : list(str) or None
@@ -1397,14 +2072,34 @@ class Cover(Dataset):
         except TypeError:
             raise IndexError('Cover.__getitem__: index must be iterable')
 
-        data = np.zeros((len(idxs),) + self.shape_static[1:])
-
-        for i, idx in enumerate(idxs):
-            interval = self.gindexer[idx]
-
-            dat = self._getsingleitem(interval)
+        padding_value = self.garray.padding_value
+        dtype = np.dtype(self.garray.typecode)
+        if self.garray.scale is not None or \
+                not float(padding_value).is_integer():
+            # dequantized data or e.g. nan padding for integer-valued data
+            dtype = np.promote_types(dtype, 'float32')
+        data = np.full((len(idxs),) + self.shape_static[1:], padding_value,
+                       dtype=dtype)
+
+        chroms, starts, ends, strands = self.gindexer.get_coords(idxs)
+        lengths = np.zeros((len(idxs),), dtype='int')
+
+        for i, (chrom, start, end) in enumerate(zip(chroms, starts, ends)):
+            dat = np.asarray(self.garray.get_slice(str(chrom), int(start),
+                                                   int(end)))
+            lengths[i] = len(dat)
             data[i, :len(dat), :, :] = dat
 
+        # invert the data of the minus strand intervals at once.
+        # Shorter, zero-padded intervals are inverted
+        # individually to keep the padding at the end.
+        negative = strands == '-'
+        full = negative & (lengths == data.shape[1])
+        if full.any():
+            data[full] = data[full, ::-1, ::-1, :]
+        for i in np.where(negative & ~full)[0]:
+            data[i, :lengths[i]] = data[i, :lengths[i]][::-1, ::-1, :].copy()
+
         return data
 
     def _getsingleitem(self, pinterval):
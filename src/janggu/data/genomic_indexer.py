@@ -1,11 +1,67 @@
 """GenomicIndexer module"""
 
+import os
+from collections import OrderedDict
+
 import numpy as np
 from pybedtools import Interval
 from sklearn.utils import check_random_state
 
 from janggu.utils import _get_genomic_reader
 
+# The parsed records of region files are memoized, such that the same
+# file is not parsed repeatedly when several datasets are constructed
+# for the same regions of interest. The cache is bounded by the total
+# number of records held.
+_REGIONS_CACHE = OrderedDict()
+_REGIONS_CACHE_MAXRECORDS = 1000000
+
+
+def _read_regions(regions):
+    """Reads the records of a region file or a region object.
+
+    Records of region files are memoized based on the absolute
+    path, the modification time in nanoseconds and the size of the file.
+
+    Parameters
+    ----------
+    regions : str or list(Interval)
+        Path to a BED or GFF file or any other region representation
+        understood by _get_genomic_reader.
+
+    Returns
+    -------
+    tuple(np.ndarray)
+        Chromosome names, starts, ends and strands of the records.
+    """
+    key = None
+    if isinstance(regions, str) and os.path.exists(regions):
+        stat = os.stat(regions)
+        key = (os.path.abspath(regions), stat.st_mtime_ns, stat.st_size)
+        if key in _REGIONS_CACHE:
+            _REGIONS_CACHE.move_to_end(key)
+            return _REGIONS_CACHE[key]
+
+    chrs, starts, ends, strands = [], [], [], []
+    for reg in _get_genomic_reader(regions):
+        chrs.append(str(reg.chrom))
+        starts.append(int(reg.start))
+        ends.append(int(reg.end))
+        strands.append(str(reg.strand))
+
+    records = (np.asarray(chrs, dtype='str'),
+               np.asarray(starts, dtype='int64'),
+               np.asarray(ends, dtype='int64'),
+               np.asarray(strands, dtype='str'))
+
+    if key is not None and len(starts) <= _REGIONS_CACHE_MAXRECORDS:
+        _REGIONS_CACHE[key] = records
+        while sum(len(rec[1]) for rec in _REGIONS_CACHE.values()) > \
+                _REGIONS_CACHE_MAXRECORDS:
+            _REGIONS_CACHE.popitem(last=False)
+
+    return records
+
 
 class GenomicIndexer(object):  # pylint: disable=too-many-instance-attributes
     """GenomicIndexer maps a set of integer indices to respective
@@ -21,10 +77,11 @@ class GenomicIndexer(object):  # pylint: disable=too-many-instance-attributes
     zero_padding = None
     collapse = None
     _randomidx = None
-    chrs = None
-    starts = None
-    strand = None
-    ends = None
+    _chrs = None
+    _starts = None
+    _strand = None
+    _ends = None
+    _coords = None
     _random_state = None
 
     @property
@@ -83,17 +140,14 @@ class GenomicIndexer(object):  # pylint: disable=too-many-instance-attributes
             random_state for shuffling intervals. Default: None
         """
 
-        regions_ = _get_genomic_reader(regions)
+        chrs, starts, ends, strands = _read_regions(regions)
 
         if binsize is None and not collapse:
             binsize_ = None
             # binsize will be inferred from bed file
             # the maximum interval length will be used
-            for reg in regions_:
-                if binsize_ is None:
-                    binsize_ = reg.length
-                if binsize_ < reg.length:
-                    binsize_ = reg.length
+            if len(starts) > 0:
+                binsize_ = int((ends - starts).max())
             binsize = binsize_
 
         if stepsize is None:
@@ -106,11 +160,10 @@ class GenomicIndexer(object):  # pylint: disable=too-many-instance-attributes
                    zero_padding=zero_padding,
                    collapse=collapse, random_state=random_state)
 
-        for reg in regions_:
+        for chrom, start, end, strand in zip(chrs.tolist(), starts.tolist(),
+                                             ends.tolist(), strands.tolist()):
 
-            gind.add_interval(
-                str(reg.chrom),
-                int(reg.start), int(reg.end), str(reg.strand))
+            gind.add_interval(chrom, start, end, strand)
 
         return gind
 
@@ -286,6 +339,82 @@ class GenomicIndexer(object):  # pylint: disable=too-many-instance-attributes
 
         raise IndexError('Cannot interpret index: {}'.format(type(index_)))
 
+    def get_coords(self, idxs):
+        """Returns the genomic coordinates for a set of indices.
+
+        This is a vectorized counterpart of __getitem__. It avoids constructing
+        an Interval object for each index by operating on numpy arrays
+        of the chromosomes, starts, ends and strands.
+
+        Parameters
+        ----------
+        idxs : iterable(int)
+            Interval indices.
+
+        Returns
+        -------
+        tuple(np.ndarray)
+            Chromosome names, starts, ends and strands of the intervals
+            including the flanks.
+        """
+        if self._coords is None:
+            self._coords = (np.asarray(self.chrs, dtype='str'),
+                            np.asarray(self.starts, dtype='int64'),
+                            np.asarray(self.ends, dtype='int64'),
+                            np.asarray(self.strand, dtype='str'))
+        chrs, starts, ends, strands = self._coords
+
+        idxs = np.asarray(idxs, dtype='int64')
+        if self.randomidx is not None:
+            idxs = self.randomidx[idxs]
+
+        starts = starts[idxs]
+        ends = ends[idxs]
+        ends = np.where(ends == starts, ends + 1, ends)
+
+        return (chrs[idxs], np.maximum(starts - self.flank, 0),
+                ends + self.flank, strands[idxs])
+
+    @property
+    def chrs(self):
+        """Chromosome names of the intervals"""
+        return self._chrs
+
+    @chrs.setter
+    def chrs(self, value):
+        self._coords = None
+        self._chrs = value
+
+    @property
+    def starts(self):
+        """Interval starts"""
+        return self._starts
+
+    @starts.setter
+    def starts(self, value):
+        self._coords = None
+        self._starts = value
+
+    @property
+    def ends(self):
+        """Interval ends"""
+        return self._ends
+
+    @ends.setter
+    def ends(self, value):
+        self._coords = None
+        self._ends = value
+
+    @property
+    def strand(self):
+        """Interval strands"""
+        return self._strand
+
+    @strand.setter
+    def strand(self, value):
+        self._coords = None
+        self._strand = value
+
     @property
     def binsize(self):
         """binsize of the intervals"""
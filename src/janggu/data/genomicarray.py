@@ -13,6 +13,24 @@ from janggu.utils import _get_output_data_location
 from janggu.utils import _iv_to_str
 from janggu.utils import _str_to_iv
 
+try:
+    import zarr  # pylint: disable=import-error
+    from numcodecs import Blosc  # pylint: disable=import-error
+except ImportError:  # pragma: no cover
+    zarr = None
+    Blosc = None
+
+# chunk lengths for storage='zarr' along the genomic positions
+# (store_whole_genome=True) and along the regions of interest
+# (store_whole_genome=False).
+_ZARR_CHUNK_LENGTH = 8192
+_ZARR_CHUNK_REGIONS = 8
+
+# chunk length and maximum number of chunks kept in memory
+# for reading the on-disk storages (hdf5 and zarr).
+_CHUNK_CACHE_LENGTH = _ZARR_CHUNK_LENGTH
+_CHUNK_CACHE_SIZE = 64
+
 
 def _get_iv_length(length, resolution):
     """obtain the chromosome length for a given resolution."""
@@ -107,12 +125,21 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
         Order of the alphabet size. Only relevant for Bioseq Datasets. Default: 1.
     collapser : None or callable
         Method to aggregate values along a given interval.
+
+    Attributes
+    ----------
+    scale : dict or None
+        Per chromosome scaling factors for each condition. If set, the
+        stored (quantized) values are multiplied by the scaling factors
+        when they are retrieved. Default: None.
     """
     handle = OrderedDict()
     _condition = None
     _resolution = None
     _order = None
     region2index = None
+    scale = None
+    _chunk_cache = None
 
     def __init__(self, stranded=True, conditions=None, typecode='d',
                  resolution=1, padding_value=0.,
@@ -153,9 +180,16 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
             while array_[start,end] indicates the slice in the
             target array / view.
         """
-        chrom = interval.chrom
-        start = self.get_iv_start(interval.start)
-        end = self.get_iv_end(interval.end) - self.order + 1
+        return self._get_slice_indices(interval.chrom, interval.start,
+                                       interval.end, arraylen)
+
+    def _get_slice_indices(self, chrom, start, end, arraylen):
+        """Array indices for a region given by chrom, start and end.
+
+        See _get_indices.
+        """
+        start = self.get_iv_start(start)
+        end = self.get_iv_end(end) - self.order + 1
 
         if start >= self.handle[chrom].shape[0]:
             return 0, 0, 0, 0
@@ -224,6 +258,7 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
             self.handle['data'][idx, :length, :, condition] = value
 
         else:
+            self._clear_chunk_cache()
             ref_start, ref_end, array_start, \
                 array_end = self._get_indices(interval, value.shape[0])
             self.handle[interval.chrom][ref_start:ref_end, :, condition] = \
@@ -262,55 +297,124 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
     def __getitem__(self, index):
         # for now lets ignore everything except for chrom, start and end.
         if isinstance(index, Interval):
-            interval = index
-            chrom = interval.chrom
-            start = self.get_iv_start(interval.start)
-            end = self.get_iv_end(interval.end)
+            return self.get_slice(index.chrom, index.start, index.end)
 
-            # original length
-            length = end-start - self.order + 1
-
-            if not self._full_genome_stored:
-                idx = self.region2index[_iv_to_str(chrom, interval.start, interval.end)]
-                # correcting for the overshooting starts and ends is not necessary
-                # for partially loaded data
-                return self._reshape(self.handle['data'][idx],
-                                     (length, 2 if self.stranded else 1,
-                                      len(self.condition)))
-
-            if chrom not in self.handle:
-                return np.ones((length, 2 if self.stranded else 1,
-                                len(self.condition)),
-                               dtype=self.typecode) * self.padding_value
-
-            if start >= 0 and end <= self.handle[chrom].shape[0]:
-                end = end - self.order + 1
-                # this is a short-cut, which does not require zero-padding
-                return self._reshape(self.handle[chrom][start:end],
-                                     (end-start, 2 if self.stranded else 1,
-                                      len(self.condition)))
-
-            # below is some functionality for zero-padding, in case the region
-            # reaches out of the chromosome size
-
-            if self.padding_value == 0.0:
-                data = np.zeros((length, 2 if self.stranded else 1,
-                                 len(self.condition)),
-                                dtype=self.typecode)
-            else:
-                data = np.ones((length, 2 if self.stranded else 1,
-                                len(self.condition)),
-                               dtype=self.typecode) * self.padding_value
+        raise IndexError("Cannot interpret interval: {}".format(index))
 
-            ref_start, ref_end, array_start, array_end = self._get_indices(interval, data.shape[0])
+    def get_slice(self, chrom, start, end):
+        """Returns the data for a genomic region.
 
-            data[array_start:array_end, :, :] = self._reshape(self.handle[chrom][ref_start:ref_end],
-                                                              (ref_end - ref_start,
-                                                               2 if self.stranded else 1,
-                                                               len(self.condition)))
-            return data
+        This is equivalent to indexing the GenomicArray with
+        an Interval, but it avoids the construction of an Interval object.
 
-        raise IndexError("Cannot interpret interval: {}".format(index))
+        Parameters
+        ----------
+        chrom : str
+            Chromosome name.
+        start : int
+            Region start.
+        end : int
+            Region end.
+
+        Returns
+        -------
+        np.ndarray
+            Data of shape (length, strands, conditions).
+        """
+        data = self._get_slice(chrom, start, end)
+        if self.scale is not None and chrom in self.scale:
+            # dequantize the stored values
+            data = np.asarray(data) * self.scale[chrom]
+        return data
+
+    def _get_slice(self, chrom, start, end):
+        ivstart, ivend = start, end
+        start = self.get_iv_start(ivstart)
+        end = self.get_iv_end(ivend)
+
+        # original length
+        length = end-start - self.order + 1
+
+        if not self._full_genome_stored:
+            idx = self.region2index[_iv_to_str(chrom, ivstart, ivend)]
+            # correcting for the overshooting starts and ends is not necessary
+            # for partially loaded data
+            return self._reshape(self.handle['data'][idx],
+                                 (length, 2 if self.stranded else 1,
+                                  len(self.condition)))
+
+        if chrom not in self.handle:
+            return np.ones((length, 2 if self.stranded else 1,
+                            len(self.condition)),
+                           dtype=self.typecode) * self.padding_value
+
+        if start >= 0 and end <= self.handle[chrom].shape[0]:
+            end = end - self.order + 1
+            # this is a short-cut, which does not require zero-padding
+            return self._reshape(self._read(chrom, start, end),
+                                 (end-start, 2 if self.stranded else 1,
+                                  len(self.condition)))
+
+        # below is some functionality for zero-padding, in case the region
+        # reaches out of the chromosome size
+
+        if self.padding_value == 0.0:
+            data = np.zeros((length, 2 if self.stranded else 1,
+                             len(self.condition)),
+                            dtype=self.typecode)
+        else:
+            data = np.ones((length, 2 if self.stranded else 1,
+                            len(self.condition)),
+                           dtype=self.typecode) * self.padding_value
+
+        ref_start, ref_end, array_start, array_end = \
+            self._get_slice_indices(chrom, ivstart, ivend, data.shape[0])
+
+        data[array_start:array_end, :, :] = self._reshape(self._read(chrom, ref_start, ref_end),
+                                                          (ref_end - ref_start,
+                                                           2 if self.stranded else 1,
+                                                           len(self.condition)))
+        return data
+
+    def _read(self, chrom, start, end):
+        """Reads a slice of a chromosome from the storage.
+
+        If the chunk cache is enabled, the slice is assembled from
+        cached chunks of length _CHUNK_CACHE_LENGTH. Recently used chunks
+        are kept in memory, such that repeated access to
+        neighboring regions does not require reading
+        (and decompressing) the data from disk again.
+        """
+        if self._chunk_cache is None or start >= end:
+            return self.handle[chrom][start:end]
+
+        first = start // _CHUNK_CACHE_LENGTH
+        last = (end - 1) // _CHUNK_CACHE_LENGTH
+        chunks = [self._get_chunk(chrom, chunk_id)
+                  for chunk_id in range(first, last + 1)]
+        offset = first * _CHUNK_CACHE_LENGTH
+        if len(chunks) == 1:
+            # copy, such that the cached chunk cannot be altered
+            return chunks[0][start - offset:end - offset].copy()
+        return np.concatenate(chunks)[start - offset:end - offset]
+
+    def _get_chunk(self, chrom, chunk_id):
+        """Returns a chunk of a chromosome using the LRU chunk cache."""
+        key = (chrom, chunk_id)
+        if key in self._chunk_cache:
+            self._chunk_cache.move_to_end(key)
+            return self._chunk_cache[key]
+
+        chunk = self.handle[chrom][chunk_id * _CHUNK_CACHE_LENGTH:
+                                   (chunk_id + 1) * _CHUNK_CACHE_LENGTH]
+        self._chunk_cache[key] = chunk
+        if len(self._chunk_cache) > _CHUNK_CACHE_SIZE:
+            self._chunk_cache.popitem(last=False)
+        return chunk
+
+    def _clear_chunk_cache(self):
+        if self._chunk_cache is not None:
+            self._chunk_cache.clear()
 
     @property
     def condition(self):
@@ -349,6 +453,7 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
 
     def scale_by_region_length(self):
         """ This method scales the regions by the region length ."""
+        self._clear_chunk_cache()
         for chrom in self.handle:
             if self._full_genome_stored:
                 self.handle[chrom][:] /= self.interval_length(chrom)
@@ -373,6 +478,7 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
     def shift(self, means):
         """Centering the signal by the weighted mean"""
         #means = self.weighted_mean()
+        self._clear_chunk_cache()
 
         for chrom in self.handle:
             # adjust base pair resoltion mean to interval length
@@ -380,6 +486,7 @@ class GenomicArray(object):  # pylint: disable=too-many-instance-attributes
 
     def rescale(self, scale):
         """ Method to rescale the signal """
+        self._clear_chunk_cache()
         for chrom in self.handle:
             self.handle[chrom][:] /= scale
 
@@ -552,6 +659,141 @@ class HDF5GenomicArray(GenomicArray):
         h5file = h5py.File(cachefile, 'a', driver='stdio')
 
         self.handle = h5file
+        if store_whole_genome:
+            self._chunk_cache = OrderedDict()
+
+
+class ZarrGenomicArray(GenomicArray):
+    """ZarrGenomicArray stores multi-dimensional genomic information.
+
+    Implements GenomicArray. The data is kept on disk
+    in LZ4-compressed chunks using zarr.
+
+    Parameters
+    ----------
+    gsize : GenomicIndexer or callable
+        GenomicIndexer containing the genome sizes or a callable that
+        returns a GenomicIndexer to enable lazy loading.
+    stranded : bool
+        Consider stranded profiles. Default: True.
+    conditions : list(str) or None
+        List of cell-type or condition labels associated with the corresponding
+        array dimensions. Default: None means a one-dimensional array is produced.
+    typecode : str
+        Datatype. Default: 'd'.
+    datatags : list(str) or None
+        Tags describing the dataset. This is used to store the cache file.
+    resolution : int
+        Resolution for storing the genomic array. Only relevant for the use
+        with Cover Datasets. Default: 1.
+    order : int
+        Order of the alphabet size. Only relevant for Bioseq Datasets. Default: 1.
+    store_whole_genome : boolean
+        Whether to store the entire genome or only the regions of interest.
+        Default: True
+    padding_value : float
+        Padding value. Default: 0.
+    cache : str or None
+        Hash string of the data and parameters to cache the dataset. If None,
+        caching is deactivated. Default: None.
+    overwrite : boolean
+        Whether to overwrite the cache. Default: False
+    loader : callable or None
+        Function to be called for loading the genomic array.
+    normalizer : callable or None
+        Normalization to be applied. This argumenet can be None,
+        if no normalization is applied, or a callable that takes
+        a garray and returns a normalized garray.
+        Default: None.
+    collapser : None or callable
+        Method to aggregate values along a given interval.
+    verbose : boolean
+        Verbosity. Default: False
+    """
+
+    def __init__(self, gsize,  # pylint: disable=too-many-locals
+                 stranded=True,
+                 conditions=None,
+                 typecode='d',
+                 datatags=None,
+                 resolution=1,
+                 order=1,
+                 padding_value=0.,
+                 store_whole_genome=True,
+                 cache=None,
+                 overwrite=False, loader=None,
+                 normalizer=None,
+                 collapser=None,
+                 verbose=False):
+        super(ZarrGenomicArray, self).__init__(stranded, conditions, typecode,
+                                               resolution,
+                                               order=order,
+                                               padding_value=padding_value,
+                                               store_whole_genome=store_whole_genome,
+                                               collapser=collapser)
+
+        if zarr is None:  # pragma: no cover
+            raise ImportError('zarr is required for storage="zarr". '
+                              'Please install zarr.')
+
+        if cache is None:
+            raise ValueError('cache=True required for zarr format')
+
+        gsize_ = None
+
+        if not store_whole_genome:
+            gsize_ = gsize() if callable(gsize) else gsize
+            self.region2index = {_iv_to_str(region.chrom,
+                                            region.start,
+                                            region.end): i \
+                                                for i, region in enumerate(gsize_)}
+
+        cachefile = _get_cachefile(cache, datatags, '.zarr')
+        load_from_file = _load_data(cache, datatags, '.zarr')
+
+        if load_from_file:
+            if gsize_ is None:
+                gsize_ = gsize() if callable(gsize) else gsize
+
+            compressor = Blosc(cname='lz4', clevel=5, shuffle=Blosc.SHUFFLE)
+            group = zarr.open_group(cachefile, mode='w')
+
+            if store_whole_genome:
+                for region in gsize_:
+                    shape = (_get_iv_length(region.length - self.order + 1, self.resolution),
+                             2 if stranded else 1, len(self.condition))
+                    group.create_dataset(str(region.chrom), shape=shape,
+                                         chunks=(min(_ZARR_CHUNK_LENGTH, shape[0]),) + shape[1:],
+                                         dtype=self.typecode,
+                                         compressor=compressor,
+                                         fill_value=padding_value)
+            else:
+                shape = (len(gsize_),
+                         _get_iv_length(gsize_.binsize + 2*gsize_.flank - self.order + 1,
+                                        self.resolution) if self.resolution is not None else 1,
+                         2 if stranded else 1, len(self.condition))
+                group.create_dataset('data', shape=shape,
+                                     chunks=(min(_ZARR_CHUNK_REGIONS, max(shape[0], 1)),) + \
+                                     shape[1:],
+                                     dtype=self.typecode,
+                                     compressor=compressor,
+                                     fill_value=padding_value)
+            self.handle = group
+
+            # invoke the loader
+            if loader:
+                loader(self)
+
+            for norm in normalizer or []:
+                get_normalizer(norm)(self)
+
+        if verbose: print('reload {}'.format(cachefile))
+        # the arrays are opened once and kept, since indexing the group
+        # re-reads the array metadata from disk on every access.
+        group = zarr.open_group(cachefile, mode='r+')
+        self.handle = {name: array for name, array in group.arrays()}
+        if store_whole_genome:
+            self._chunk_cache = OrderedDict()
 
 
 class NPGenomicArray(GenomicArray):
@@ -887,6 +1129,7 @@ class PercentileTrimming(object):
                                       chrom in garray.handle]), axis=0),
                                self.percentile, axis=(0, 1))
 
+        garray._clear_chunk_cache()
         for icond, quant in enumerate(quants):
             for chrom in garray.handle:
                 arr = garray.handle[chrom][:, :, icond]
@@ -994,6 +1237,7 @@ class LogTransform(object):
 
     def __call__(self, garray):
 
+        garray._clear_chunk_cache()
         for chrom in garray.handle:
             garray.handle[chrom][:] = np.log(garray.handle[chrom][:] + 1.)
         return garray
@@ -1108,9 +1352,11 @@ def create_genomic_array(chroms, stranded=True, conditions=None, typecode='float
     typecode : str
         Datatype. Default: 'float32'.
     storage : str
-        Storage type can be 'ndarray', 'hdf5' or 'sparse'.
+        Storage type can be 'ndarray', 'hdf5', 'zarr' or 'sparse'.
         Numpy loads the entire dataset into the memory. HDF5 keeps
         the data on disk and loads the mini-batches from disk.
+        Zarr keeps the data on disk as well, but in LZ4-compressed chunks,
+        which reduces the storage requirements considerably.
         Sparse maintains sparse matrix representation of the dataset
         in the memory.
         Usage of numpy will require high memory consumption, but allows fast
@@ -1174,6 +1420,21 @@ def create_genomic_array(chroms, stranded=True, conditions=None, typecode='float
                                 normalizer=normalizer,
                                 collapser=get_collapser(collapser),
                                 verbose=verbose)
+    elif storage == 'zarr':
+        return ZarrGenomicArray(chroms, stranded=stranded,
+                                conditions=conditions,
+                                typecode=typecode,
+                                datatags=datatags,
+                                resolution=resolution,
+                                order=order,
+                                store_whole_genome=store_whole_genome,
+                                cache=cache,
+                                padding_value=padding_value,
+                                overwrite=overwrite,
+                                loader=loader,
+                                normalizer=normalizer,
+                                collapser=get_collapser(collapser),
+                                verbose=verbose)
     elif storage == 'ndarray':
         return NPGenomicArray(chroms, stranded=stranded,
                               conditions=conditions,
@@ -1204,4 +1465,4 @@ def create_genomic_array(chroms, stranded=True, conditions=None, typecode='float
                                   collapser=get_collapser(collapser),
                                   verbose=verbose)
 
-    raise Exception("Storage type must be 'hdf5', 'ndarray' or 'sparse'")
+    raise Exception("Storage type must be 'hdf5', 'zarr', 'ndarray' or 'sparse'")
@@ -7,8 +7,11 @@ matplotlib.use('AGG')  # pylint: disable=
 import numpy as np
 import pandas
 import pkg_resources
+import pyBigWig
+import pysam
 import pytest
 from pybedtools import BedTool
+from pybedtools import Interval
 
 from janggu.data import Bioseq
 from janggu.data import Cover
@@ -18,6 +21,8 @@ from janggu.data import plotGenomeTrack
 from janggu.data import LineTrack
 from janggu.data import SeqTrack
 from janggu.data import HeatTrack
+from janggu.data.coverage import _bam_read_positions
+from janggu.data.coverage import _fill_bed_array
 
 
 def test_channel_last_first():
@@ -733,6 +738,84 @@ def test_bigwig_store_whole_genome_option():
     assert cover3[:].sum() == 1044.0
 
 
+def test_store_whole_genome_restricted_to_roi_chroms():
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bwfile_ = os.path.join(data_path, "sample.bw")
+    bamfile_ = os.path.join(data_path, "sample.bam")
+    roi = [Interval('chr1', 15000, 15400)]
+
+    cover = Cover.create_from_bigwig(
+        'test',
+        bigwigfiles=bwfile_,
+        roi=roi,
+        store_whole_genome=True,
+        binsize=200, stepsize=200,
+        storage='ndarray')
+    assert list(cover.garray.handle) == ['chr1']
+    assert len(cover) == 2
+
+    cover = Cover.create_from_bam(
+        'test',
+        bamfiles=bamfile_,
+        roi=roi,
+        store_whole_genome=True,
+        binsize=200, stepsize=200,
+        storage='ndarray')
+    assert list(cover.garray.handle) == ['chr1']
+    assert len(cover) == 2
+
+
+def test_load_cover_bigwig_roi_beyond_chrom_end():
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bwfile_ = os.path.join(data_path, "sample.bw")
+
+    # chr1 has a length of 30000 bp
+    roi = [Interval('chr1', 26000, 30200)]
+    expected = np.zeros(4200)
+    expected[:4000] = np.nan_to_num(
+        pyBigWig.open(bwfile_).values('chr1', 26000, 30000))
+    assert expected.sum() > 0
+
+    for store_whole_genome in [False, True]:
+        cover = Cover.create_from_bigwig(
+            'test',
+            bigwigfiles=bwfile_,
+            roi=roi,
+            binsize=4200,
+            resolution=1,
+            store_whole_genome=store_whole_genome)
+
+        assert cover.shape == (1, 4200, 1, 1)
+        # the region beyond the chromosome end is zero-padded
+        np.testing.assert_equal(cover[0][0, :, 0, 0], expected)
+
+
+def test_bigwig_workers():
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bed_file = os.path.join(data_path, "sample.bed")
+    bwfile_ = os.path.join(data_path, "sample.bw")
+
+    for resolution in [1, 50]:
+        cover1 = Cover.create_from_bigwig(
+            'test',
+            bigwigfiles=bwfile_,
+            roi=bed_file,
+            store_whole_genome=True,
+            binsize=200, stepsize=200,
+            resolution=resolution,
+            storage='ndarray')
+        cover2 = Cover.create_from_bigwig(
+            'test2',
+            bigwigfiles=bwfile_,
+            roi=bed_file,
+            store_whole_genome=True,
+            binsize=200, stepsize=200,
+            resolution=resolution,
+            storage='ndarray', workers=2)
+
+        np.testing.assert_equal(cover1[:], cover2[:])
+
+
 def test_bigwig_store_whole_genome_option_dataframe(tmpdir):
     os.environ['JANGGU_OUTPUT'] = tmpdir.strpath
     data_path = pkg_resources.resource_filename('janggu', 'resources/')
@@ -933,6 +1016,96 @@ def test_bam_store_whole_genome_option_dataframe(tmpdir):
     assert cover1[:].sum() == 29.
 
 
+def _make_read(header, flag, start, next_tid=-1, next_start=-1, tlen=0,
+               mapq=30):
+    read = pysam.AlignedSegment(header)
+    read.query_name = 'read'
+    read.flag = flag
+    read.reference_id = 0
+    read.reference_start = start
+    read.mapping_quality = mapq
+    read.cigarstring = '20M'
+    read.query_sequence = 'A' * 20
+    read.next_reference_id = next_tid
+    read.next_reference_start = next_start
+    read.template_length = tlen
+    return read
+
+
+def test_bam_read_positions():
+    header = pysam.AlignmentHeader.from_dict(
+        {'SQ': [{'SN': 'chr1', 'LN': 1000}, {'SN': 'chr2', 'LN': 1000}]})
+
+    reads = [
+        # single-end forward and reverse reads
+        _make_read(header, 0, 10),
+        _make_read(header, 16, 50),
+        # proper pair: read1 forward and read2 reverse
+        _make_read(header, 99, 100, next_tid=0, next_start=150, tlen=70),
+        _make_read(header, 147, 150, next_tid=0, next_start=100, tlen=-70),
+        # improper pair
+        _make_read(header, 65, 200, next_tid=0, next_start=250, tlen=70),
+        # mate mapped to another chromosome
+        _make_read(header, 99, 300, next_tid=1, next_start=350, tlen=70),
+        # low mapping quality
+        _make_read(header, 0, 400, mapq=5),
+    ]
+
+    pos, rev = _bam_read_positions(reads, 0, 10, '5prime', 1000)
+    np.testing.assert_equal(pos, [10, 70, 100, 170])
+    np.testing.assert_equal(rev, [False, True, False, True])
+
+    # read2 is discarded and read1 is placed at the fragment mid point
+    pos, rev = _bam_read_positions(reads, 0, 10, 'midpoint', 1000)
+    np.testing.assert_equal(pos, [10, 70, 135])
+    np.testing.assert_equal(rev, [False, True, False])
+
+    # no mapping quality filter
+    pos, rev = _bam_read_positions(reads, 0, 0, '5prime', 1000)
+    np.testing.assert_equal(pos, [10, 70, 100, 170, 400])
+    np.testing.assert_equal(rev, [False, True, False, True, False])
+
+    # reads whose 5 prime end or mid point lies beyond
+    # the chromosome end are discarded
+    reads = [
+        _make_read(header, 0, 975),
+        _make_read(header, 16, 975),
+        _make_read(header, 99, 960, next_tid=0, next_start=980, tlen=40),
+        _make_read(header, 99, 970, next_tid=0, next_start=990, tlen=40),
+    ]
+    pos, rev = _bam_read_positions(reads, 0, 10, '5prime', 990)
+    np.testing.assert_equal(pos, [975, 960, 970])
+    np.testing.assert_equal(rev, [False, False, False])
+
+    pos, rev = _bam_read_positions(reads, 0, 10, 'midpoint', 990)
+    np.testing.assert_equal(pos, [975, 980])
+    np.testing.assert_equal(rev, [False, False])
+
+
+def test_bam_workers():
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bed_file = os.path.join(data_path, "sample.bed")
+    bamfile_ = os.path.join(data_path, "sample.bam")
+
+    cover1 = Cover.create_from_bam(
+        'test',
+        bamfiles=bamfile_,
+        roi=bed_file,
+        store_whole_genome=True,
+        binsize=200, stepsize=200,
+        storage='ndarray')
+    cover2 = Cover.create_from_bam(
+        'test2',
+        bamfiles=bamfile_,
+        roi=bed_file,
+        store_whole_genome=True,
+        binsize=200, stepsize=200,
+        storage='ndarray', workers=2)
+
+    np.testing.assert_equal(cover1[:], cover2[:])
+    assert cover1[:].sum() == 29.
+
+
 def test_bam_store_whole_genome_option():
     data_path = pkg_resources.resource_filename('janggu', 'resources/')
     bed_file = os.path.join(data_path, "sample.bed")
@@ -1601,6 +1774,71 @@ def test_load_cover_bigwig_resolution1(tmpdir):
 
 
 
+def test_load_cover_bigwig_sparse(tmpdir):
+    bwfile_ = os.path.join(tmpdir.strpath, "sparse.bw")
+    bwfile = pyBigWig.open(bwfile_, 'w')
+    bwfile.addHeader([('chr1', 1000), ('chr2', 1000)])
+    bwfile.addEntries(['chr1', 'chr1'], [10, 95], ends=[30, 120],
+                      values=[1.5, -2.])
+    bwfile.close()
+
+    roi = [Interval('chr1', 0, 100), Interval('chr1', 100, 200)]
+
+    cover = Cover.create_from_bigwig("cov", bigwigfiles=bwfile_,
+                                     roi=roi, binsize=100)
+    expected = np.zeros((200,))
+    expected[10:30] = 1.5
+    expected[95:120] = -2.
+    np.testing.assert_equal(cover[:].ravel(), expected)
+
+    cover = Cover.create_from_bigwig("cov", bigwigfiles=bwfile_,
+                                     roi=roi, binsize=100,
+                                     nan_to_num=False)
+    expected[expected == 0] = np.nan
+    np.testing.assert_equal(cover[:].ravel(), expected)
+
+
+def test_load_cover_bigwig_quantize(tmpdir):
+    os.environ['JANGGU_OUTPUT'] = tmpdir.strpath
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+
+    bwfile_ = os.path.join(data_path, "sample.bw")
+
+    bed_file = os.path.join(data_path, "sample.bed")
+
+    for store in ['ndarray', 'hdf5', 'sparse']:
+        for resolution in [1, 50]:
+            cover = Cover.create_from_bigwig(
+                "cov",
+                bigwigfiles=bwfile_,
+                roi=bed_file,
+                binsize=200, stepsize=200,
+                resolution=resolution,
+                storage=store, cache=True)
+            qcover = Cover.create_from_bigwig(
+                "cov",
+                bigwigfiles=bwfile_,
+                roi=bed_file,
+                binsize=200, stepsize=200,
+                resolution=resolution,
+                storage=store, cache=True, quantize=True)
+
+            assert qcover.garray.typecode == 'int16'
+            assert qcover[:].dtype == np.float32
+            np.testing.assert_equal(qcover.shape, cover.shape)
+            np.testing.assert_allclose(qcover[:], cover[:], atol=1e-4)
+
+    with pytest.raises(ValueError):
+        Cover.create_from_bigwig(
+            "cov", bigwigfiles=bwfile_, roi=bed_file,
+            binsize=200, normalizer='zscore', quantize=True)
+
+    with pytest.raises(ValueError):
+        Cover.create_from_bigwig(
+            "cov", bigwigfiles=bwfile_, roi=bed_file,
+            binsize=200, resolution=50, collapser='sum', quantize=True)
+
+
 def test_load_cover_bigwig_resolutionNone(tmpdir):
     os.environ['JANGGU_OUTPUT'] = tmpdir.strpath
     data_path = pkg_resources.resource_filename('janggu', 'resources/')
@@ -1699,6 +1937,53 @@ def test_load_cover_bed_binary(tmpdir):
         np.testing.assert_equal(cover[4].sum(), 1)
 
 
+def test_load_cover_bed_workers():
+    bed_file = pkg_resources.resource_filename('janggu', 'resources/sample.bed')
+    score_file = pkg_resources.resource_filename('janggu',
+                                                 'resources/scored_sample.bed')
+
+    covers = [Cover.create_from_bed(
+        "cov",
+        bedfiles=[score_file, bed_file],
+        roi=bed_file,
+        binsize=200, stepsize=200,
+        resolution=200,
+        store_whole_genome=True,
+        mode='score', workers=workers) for workers in [1, 2]]
+
+    np.testing.assert_equal(covers[0][:], covers[1][:])
+
+
+def test_fill_bed_array():
+    # equal scores
+    array = np.zeros((10, 2))
+    _fill_bed_array(array, np.array([1, 6]), np.array([3, 8]),
+                    np.array([2., 2.]))
+    np.testing.assert_equal(array[:, 0], [0, 2, 2, 0, 0, 0, 2, 2, 0, 0])
+    np.testing.assert_equal(array[:, 1], [0, 1, 1, 0, 0, 0, 1, 1, 0, 0])
+
+    # non-overlapping features with different scores,
+    # including adjacent features and a feature beyond the array
+    array = np.zeros((10, 2))
+    _fill_bed_array(array, np.array([6, 1, 3, 9]), np.array([8, 3, 4, 12]),
+                    np.array([5., 1., 3., 4.]))
+    np.testing.assert_equal(array[:, 0], [0, 1, 1, 3, 0, 0, 5, 5, 0, 4])
+    np.testing.assert_equal(array[:, 1], [0, 1, 1, 1, 0, 0, 1, 1, 0, 1])
+
+    # overlapping features retain the later score
+    array = np.zeros((10, 2))
+    _fill_bed_array(array, np.array([1, 2, 7]), np.array([5, 4, 9]),
+                    np.array([1., 2., 3.]))
+    np.testing.assert_equal(array[:, 0], [0, 1, 2, 2, 1, 0, 0, 3, 3, 0])
+    np.testing.assert_equal(array[:, 1], [0, 1, 1, 1, 1, 0, 0, 1, 1, 0])
+
+    # no features
+    array = np.zeros((10, 2))
+    _fill_bed_array(array, np.array([], dtype='int64'),
+                    np.array([], dtype='int64'), np.array([]))
+    np.testing.assert_equal(array, 0)
+
+
 def test_load_cover_bed_scored():
     bed_file = pkg_resources.resource_filename('janggu', 'resources/sample.bed')
     score_file = pkg_resources.resource_filename('janggu',
@@ -3,8 +3,10 @@ import os
 import matplotlib
 import pkg_resources
 import pytest
+from pybedtools import Interval
 
 from janggu.data import Bioseq
+from janggu.data import Cover
 from janggu.data import split_train_test
 from janggu.data import subset
 from janggu.data import view
@@ -109,3 +111,21 @@ def test_view_bed_test():
     subdna = view(dna, use_regions=bedsub_file)
 
     assert len(subdna) == 4
+
+
+def test_view_chrom_not_loaded():
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bwfile_ = os.path.join(data_path, 'sample.bw')
+
+    # only chr1 is loaded, since the roi is restricted to it
+    cover = Cover.create_from_bigwig('test',
+                                     bigwigfiles=bwfile_,
+                                     roi=[Interval('chr1', 15000, 15400)],
+                                     binsize=200, stepsize=200,
+                                     store_whole_genome=True)
+
+    subcover = view(cover, use_regions=[Interval('chr1', 15200, 15400)])
+    assert len(subcover) == 1
+
+    with pytest.raises(ValueError):
+        view(cover, use_regions=[Interval('chr2', 1000, 1200)])
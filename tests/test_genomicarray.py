@@ -144,6 +144,86 @@ def test_bwga_instance_stranded_notcached(tmpdir):
     np.testing.assert_equal(ga[iv].sum(), 20)
 
 
+def test_get_slice():
+    ga = create_genomic_array(GenomicIndexer.create_from_genomesize({'chr10': 300}),
+                              stranded=True, typecode='int8',
+                              storage='ndarray', cache=False)
+    iv = Interval('chr10', 100, 120)
+    x = np.zeros((20, 2, 1))
+    x[:, :1, :] = 1
+    ga[iv, 0] = x[:, :, 0]
+
+    np.testing.assert_equal(ga.get_slice('chr10', 100, 120), x)
+    np.testing.assert_equal(ga.get_slice('chr10', 90, 130),
+                            ga[Interval('chr10', 90, 130)])
+    # regions reaching beyond the chromosome end are padded
+    np.testing.assert_equal(ga.get_slice('chr10', 290, 310).shape, (20, 2, 1))
+    np.testing.assert_equal(ga.get_slice('chr10', 290, 310).sum(), 0)
+
+
+def test_hdf5_chunk_cache(tmpdir, monkeypatch):
+    os.environ['JANGGU_OUTPUT'] = tmpdir.strpath
+    import janggu.data.genomicarray as genomicarray
+    monkeypatch.setattr(genomicarray, '_CHUNK_CACHE_LENGTH', 7)
+    monkeypatch.setattr(genomicarray, '_CHUNK_CACHE_SIZE', 3)
+
+    gsize = GenomicIndexer.create_from_genomesize({'chr10': 300})
+    x = np.arange(600).reshape((300, 2))
+
+    def _loader(garray):
+        garray[Interval('chr10', 0, 300), 0] = x
+
+    ga = create_genomic_array(gsize, stranded=True, typecode='int32',
+                              storage='hdf5', cache='chunk_cache',
+                              loader=_loader)
+    assert ga._chunk_cache is not None
+
+    for start, end in [(0, 5), (3, 30), (5, 7), (290, 310), (10, 50), (3, 30)]:
+        np.testing.assert_equal(ga.get_slice('chr10', start, end)[:min(end, 300) - start, :, 0],
+                                x[start:end])
+    assert len(ga._chunk_cache) <= 3
+
+    # writing to the array invalidates the cached chunks
+    ga[Interval('chr10', 3, 30), 0] = np.zeros((27, 2))
+    np.testing.assert_equal(ga.get_slice('chr10', 3, 30), np.zeros((27, 2, 1)))
+
+
+def test_zarr_no_cache():
+    pytest.importorskip('zarr')
+
+    with pytest.raises(Exception):
+        # cache must be True
+        ga = create_genomic_array(GenomicIndexer.create_from_genomesize({'chr10': 300}),
+                                  stranded=True, typecode='int8',
+                                  storage='zarr', cache=None)
+
+
+def test_zarr_instance_stranded(tmpdir):
+    pytest.importorskip('zarr')
+    os.environ['JANGGU_OUTPUT'] = tmpdir.strpath
+
+    def loading(garray):
+        x = np.zeros((20, 2))
+        x[:, 0] = 1
+        garray[Interval('chr10', 100, 120), 0] = x
+        return garray
+
+    iv = Interval('chr10', 100, 120, strand='+')
+    ga = create_genomic_array(GenomicIndexer.create_from_genomesize({'chr10': 30000}),
+                              stranded=True, typecode='int8',
+                              storage='zarr', cache='cache_file', loader=loading)
+    x = np.zeros((20, 2, 1))
+    x[:, :1, :] = 1
+    np.testing.assert_equal(ga[iv], x)
+    np.testing.assert_equal(ga[Interval('chr10', 0, 30000)].sum(), 20)
+
+    # reload from cache
+    ga = create_genomic_array(GenomicIndexer.create_from_genomesize({'chr10': 30000}),
+                              stranded=True, typecode='int8',
+                              storage='zarr', cache='cache_file')
+    np.testing.assert_equal(ga[iv], x)
+
+
 def test_zscore_normalization(tmpdir):
     os.environ['JANGGU_OUTPUT'] = tmpdir.strpath
 
@@ -152,7 +232,14 @@ def test_zscore_normalization(tmpdir):
         garray[Interval('chr2', 0, 300), 0] = np.repeat(-1, 300).reshape(-1,1)
         return garray
 
-    for store in ['ndarray', 'hdf5']:
+    stores = ['ndarray', 'hdf5']
+    try:
+        import zarr  # noqa
+        stores += ['zarr']
+    except ImportError:  # pragma: no cover
+        pass
+
+    for store in stores:
         ga = create_genomic_array(GenomicIndexer.create_from_genomesize({'chr1': 150, 'chr2': 300}),
                                   stranded=False, typecode='float32',
                                   storage=store, cache=True, loader=loading,
@@ -1,4 +1,5 @@
 import os
+from collections import OrderedDict
 
 import matplotlib
 import numpy as np
@@ -7,6 +8,7 @@ import pytest
 import pandas as pd
 
 from janggu.data import GenomicIndexer
+from janggu.data import genomic_indexer
 
 matplotlib.use('AGG')
 
@@ -127,3 +129,79 @@ def test_gindexer_merged_variable_length_ranges():
     iv = gi[-1]
     np.testing.assert_equal((iv.chrom, iv.start, iv.end, iv.strand),
                             ('chr2', 24000, 25000, '-'))
+
+
+def test_gindexer_get_coords():
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+
+    gi = GenomicIndexer.create_from_file(
+        os.path.join(data_path, 'sample.bed'), binsize=3000,
+        stepsize=3000, flank=100, zero_padding=True, random_state=42)
+
+    chrs, starts, ends, strands = gi.get_coords(range(len(gi)))
+    for i in range(len(gi)):
+        iv = gi[i]
+        np.testing.assert_equal((chrs[i], starts[i], ends[i], strands[i]),
+                                (iv.chrom, iv.start, iv.end, iv.strand))
+
+    # the coordinates are updated when intervals are added
+    gi = GenomicIndexer.create_from_file(
+        os.path.join(data_path, 'sample.bed'), binsize=3000,
+        stepsize=3000, flank=100, zero_padding=True)
+    gi.get_coords([0])
+    gi.add_interval('chr3', 0, 3000, '+')
+    chrs, starts, ends, _ = gi.get_coords([len(gi) - 1])
+    iv = gi[len(gi) - 1]
+    np.testing.assert_equal((chrs[0], starts[0], ends[0]),
+                            (iv.chrom, iv.start, iv.end))
+
+
+def test_gindexer_create_from_file_memoized(tmpdir):
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bedfile = tmpdir.join('regions.bed')
+    with open(os.path.join(data_path, 'sample_equalsize.bed')) as bed:
+        bedfile.write(bed.read())
+
+    gi1 = GenomicIndexer.create_from_file(str(bedfile),
+                                          binsize=200, stepsize=200)
+    gi2 = GenomicIndexer.create_from_file(str(bedfile),
+                                          binsize=200, stepsize=200)
+    assert gi1 is not gi2
+    assert gi1.tostr() == gi2.tostr()
+
+    # modifying the returned indexer does not affect the cached one
+    gi1.add_interval('chr1', 0, 200, '.')
+    assert len(gi1) == 5
+    gi3 = GenomicIndexer.create_from_file(str(bedfile),
+                                          binsize=200, stepsize=200)
+    assert len(gi3) == 4
+
+    # a modified file is parsed again
+    bedfile.write('chr1\t0\t200\n', mode='a')
+    gi4 = GenomicIndexer.create_from_file(str(bedfile),
+                                          binsize=200, stepsize=200)
+    assert len(gi4) == 5
+
+
+def test_gindexer_regions_cache_bounded(tmpdir, monkeypatch):
+    data_path = pkg_resources.resource_filename('janggu', 'resources/')
+    bedfiles = []
+    for i in range(3):
+        bedfile = tmpdir.join('regions{}.bed'.format(i))
+        with open(os.path.join(data_path, 'sample_equalsize.bed')) as bed:
+            bedfile.write(bed.read())
+        bedfiles.append(str(bedfile))
+
+    monkeypatch.setattr(genomic_indexer, '_REGIONS_CACHE', OrderedDict())
+    monkeypatch.setattr(genomic_indexer, '_REGIONS_CACHE_MAXRECORDS', 8)
+
+    for bedfile in bedfiles:
+        GenomicIndexer.create_from_file(bedfile, binsize=200, stepsize=200)
+
+    # only the parsed records are cached, up to 8 records in total
+    cache = genomic_indexer._REGIONS_CACHE
+    assert len(cache) == 2
+    assert [key[0] for key in cache] == [os.path.abspath(f)
+                                         for f in bedfiles[1:]]
+    for chrs, starts, ends, strands in cache.values():
+        assert len(chrs) == len(starts) == len(ends) == len(strands) == 4